@@ -18,6 +18,12 @@ import os
 import sys
 from pathlib import Path
 
+try:
+    import orjson  # Optional faster JSON decoder
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 
 REQUIRED_DOCS = [
     ("README.md", "project description, features, architecture, usage"),
@@ -26,10 +32,18 @@ REQUIRED_DOCS = [
     ("TODO.md", "outstanding issues and planned work"),
 ]
 
+# Names whose presence marks a directory as a project (home dir, tmp, etc.
+# have none): at least a .git, src/, or some code files
+_PROJECT_MARKERS = frozenset({
+    ".git", "src", "package.json", "pyproject.toml",
+    "setup.py", "Cargo.toml", "go.mod", "CLAUDE.md",
+})
+_REQUIRED_NAMES = frozenset(name for name, _ in REQUIRED_DOCS)
+
 
 def main() -> None:
     try:
-        input_data = json.load(sys.stdin)
+        input_data = _loads(sys.stdin.buffer.read())
     except (json.JSONDecodeError, Exception):
         sys.exit(0)
 
@@ -42,27 +56,29 @@ def main() -> None:
     if not project_path.is_dir():
         sys.exit(0)
 
-    # Skip non-project directories (home dir, tmp, etc.)
-    # A project should have at least a .git, src/, or some code files
-    is_project = (
-        (project_path / ".git").exists()
-        or (project_path / "src").exists()
-        or (project_path / "package.json").exists()
-        or (project_path / "pyproject.toml").exists()
-        or (project_path / "setup.py").exists()
-        or (project_path / "Cargo.toml").exists()
-        or (project_path / "go.mod").exists()
-        or (project_path / "CLAUDE.md").exists()
-    )
-    if not is_project:
+    # List the directory once instead of probing each name with stat().
+    # Symlinks are left out so they are checked by exists() below, which
+    # follows them.
+    try:
+        with os.scandir(project_path) as it:
+            names = {entry.name for entry in it if not entry.is_symlink()}
+    except OSError:
+        names = set()  # Unlistable: fall back to exists() for every name
+
+    # Skip non-project directories. A name missing from the listing may
+    # still exist under a different case on case-insensitive filesystems
+    # (macOS, Windows), so those fall back to exists().
+    if not names & _PROJECT_MARKERS and not any(
+        (project_path / marker).exists() for marker in _PROJECT_MARKERS
+    ):
         sys.exit(0)
 
-    # Check which docs are missing
-    missing = []
-    for filename, purpose in REQUIRED_DOCS:
-        if not (project_path / filename).exists():
-            missing.append((filename, purpose))
-
+    # Check which docs are missing, in REQUIRED_DOCS order
+    missing_names = _REQUIRED_NAMES - names
+    missing = [
+        (filename, purpose) for filename, purpose in REQUIRED_DOCS
+        if filename in missing_names and not (project_path / filename).exists()
+    ]
     if not missing:
         sys.exit(0)  # All docs present, nothing to report
 
@@ -22,7 +22,49 @@ import os
 import re
 import sys
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import AnyStr, Dict, List, Optional, Tuple, Union
+
+try:
+    import orjson  # Optional faster JSON decoder
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+
+# Regex metacharacters stripped from Grep patterns to get plain keywords
+_METACHARS_RE = re.compile(r'[\\.*+?^${}()|[\]]')
+
+# Path components too generic to be useful search terms
+_GENERIC_PATH_PARTS = frozenset({"src", "lib", "usr", "var", "tmp", "Users"})
+
+# Index files to search, with the label shown for their matches
+_INDEX_FILES = (
+    ("symbols.txt", "Symbols"),
+    ("file-tree.txt", "Files"),
+    ("dependencies.txt", "Dependencies"),
+)
+
+# Line breaks that str.splitlines() honours besides "\n"
+_OTHER_LINE_BREAKS = ("\r", "\x0b", "\x0c", "\x1c", "\x1d", "\x1e", "\x85", "\u2028", "\u2029")
+_OTHER_LINE_BREAKS_ASCII = tuple(sep.encode("ascii") for sep in _OTHER_LINE_BREAKS if sep.isascii())
+
+# What str.strip() removes from ASCII text; bytes.strip() keeps \x1c-\x1f
+_ASCII_WHITESPACE = bytes(c for c in range(128) if chr(c).isspace())
+
+
+def _walk_for_index_dir(cwd: str) -> Optional[Path]:
+    """Look for .claude/repo-index/ in cwd and its parents up to home."""
+    home = os.path.expanduser("~")
+    current = cwd
+    while True:
+        index_dir = os.path.join(current, ".claude", "repo-index")
+        if os.path.isdir(index_dir):
+            return Path(index_dir)
+        # Stop at home directory or the filesystem root
+        parent = os.path.dirname(current)
+        if current == home or parent == current:
+            return None
+        current = parent
 
 
 def find_repo_index_dir() -> Optional[Path]:
@@ -30,26 +72,12 @@ def find_repo_index_dir() -> Optional[Path]:
     # 1. Check CLAUDE_PROJECT_DIR env var
     project_dir = os.environ.get("CLAUDE_PROJECT_DIR")
     if project_dir:
-        index_dir = Path(project_dir) / ".claude" / "repo-index"
-        if index_dir.is_dir():
-            return index_dir
-
-    # 2. Check current working directory
-    cwd = Path.cwd()
-    index_dir = cwd / ".claude" / "repo-index"
-    if index_dir.is_dir():
-        return index_dir
-
-    # 3. Walk up from cwd looking for it
-    for parent in cwd.parents:
-        index_dir = parent / ".claude" / "repo-index"
-        if index_dir.is_dir():
-            return index_dir
-        # Stop at home directory
-        if parent == Path.home():
-            break
+        index_dir = os.path.join(project_dir, ".claude", "repo-index")
+        if os.path.isdir(index_dir):
+            return Path(index_dir)
 
-    return None
+    # 2. Walk up from cwd looking for it
+    return _walk_for_index_dir(os.getcwd())
 
 
 def extract_search_terms(tool_name: str, tool_input: dict) -> List[str]:
@@ -60,7 +88,7 @@ def extract_search_terms(tool_name: str, tool_input: dict) -> List[str]:
         pattern = tool_input.get("pattern", "")
         if pattern:
             # Strip regex metacharacters to get plain keywords
-            clean = re.sub(r'[\\.*+?^${}()|[\]]', ' ', pattern)
+            clean = _METACHARS_RE.sub(' ', pattern)
             words = [w for w in clean.split() if len(w) >= 3]
             terms.extend(words)
             # Also keep the raw pattern for exact matching
@@ -81,10 +109,84 @@ def extract_search_terms(tool_name: str, tool_input: dict) -> List[str]:
     if path:
         path_parts = Path(path).parts
         for part in path_parts:
-            if len(part) >= 3 and part not in ("src", "lib", "usr", "var", "tmp", "Users"):
+            if len(part) >= 3 and part not in _GENERIC_PATH_PARTS:
                 terms.append(part)
 
-    return list(set(terms))  # deduplicate
+    return list(dict.fromkeys(terms))  # deduplicate, keeping first-seen order
+
+
+def _load_index(filepath: Path) -> Optional[Union[bytes, str]]:
+    """Read an index file: as bytes if it is pure ASCII, else as str.
+
+    Returns None if the file cannot be read or is not valid UTF-8.
+    """
+    try:
+        content = filepath.read_bytes()
+        if not content.isascii():
+            return content.decode("utf-8")
+    except Exception:
+        return None
+    return content
+
+
+def _scan_buffer(
+    content: AnyStr, lowered: AnyStr, terms: List[AnyStr], wanted: int
+) -> List[AnyStr]:
+    """Find the first `wanted` matching lines of a file, in file order.
+
+    lowered is the whole file lowercased, with the same length as content so
+    that offsets line up, and "\n" as its only line break. Each term is
+    searched with find() over the whole buffer, so lines without a match
+    are never touched from Python.
+    """
+    if isinstance(content, bytes):
+        newline, comment, whitespace = b"\n", b"#", _ASCII_WHITESPACE
+    else:
+        newline, comment, whitespace = "\n", "#", None
+    hits: Dict[int, int] = {}  # line start -> line end
+
+    for term in terms:
+        # The first `wanted` lines overall are among each term's first `wanted`
+        found = 0
+        pos = lowered.find(term)
+        while pos != -1:
+            start = lowered.rfind(newline, 0, pos) + 1
+            end = lowered.find(newline, pos)
+            if end == -1:
+                end = len(lowered)
+            line = content[start:end]
+            # Skip comment/header lines
+            if not line.startswith(comment) and line.strip(whitespace):
+                hits[start] = end
+                found += 1
+                if found >= wanted:
+                    break
+            pos = lowered.find(term, end + 1)
+
+    return [content[start:hits[start]] for start in sorted(hits)[:wanted]]
+
+
+def _scan_lines(text: str, terms: List[str], wanted: int) -> List[str]:
+    """Find the first `wanted` matching lines of a file, in file order.
+
+    Used when lowercasing changes the text's length or it has line breaks
+    other than "\n", so offsets into the lowered text can't be used.
+    """
+    matched = []
+    for line in text.splitlines():
+        # Skip comment/header lines
+        if line.startswith("#") or not line.strip():
+            continue
+        line_lower = line.lower()
+        for term in terms:
+            if term in line_lower:
+                break
+        else:
+            continue  # No term matched
+        matched.append(line)
+        if len(matched) >= wanted:
+            break
+    return matched
 
 
 def search_index_files(index_dir: Path, terms: List[str], max_lines: int = 30) -> str:
@@ -92,40 +194,41 @@ def search_index_files(index_dir: Path, terms: List[str], max_lines: int = 30) -
     if not terms:
         return ""
 
-    index_files = [
-        ("symbols.txt", "Symbols"),
-        ("file-tree.txt", "Files"),
-        ("dependencies.txt", "Dependencies"),
-    ]
+    # Lowercase terms once. A term spanning a line break can't match a line.
+    lowered = [term.lower() for term in terms if "\n" not in term and "\r" not in term]
+    if not lowered:
+        return ""
+    lowered_bytes = [term.encode("utf-8") for term in lowered]
 
     all_matches: List[str] = []
+    limit = max_lines // len(_INDEX_FILES)
+    # One extra line is enough to know whether to print the label
+    wanted = max(limit, 1)
 
-    for filename, label in index_files:
-        filepath = index_dir / filename
-        if not filepath.exists():
-            continue
-
-        try:
-            content = filepath.read_text(encoding="utf-8")
-        except Exception:
+    for filename, label in _INDEX_FILES:
+        content = _load_index(index_dir / filename)
+        if content is None:
             continue
 
-        lines = content.splitlines()
-        matched = []
-
-        for line in lines:
-            # Skip comment/header lines
-            if line.startswith("#") or not line.strip():
-                continue
-            line_lower = line.lower()
-            for term in terms:
-                if term.lower() in line_lower:
-                    matched.append(line)
-                    break  # Only match once per line
+        if isinstance(content, bytes):
+            # bytes.lower() keeps the length of ASCII text
+            if any(sep in content for sep in _OTHER_LINE_BREAKS_ASCII):
+                matched = _scan_lines(content.decode("ascii"), lowered, wanted)
+            else:
+                matched = [
+                    line.decode("ascii")
+                    for line in _scan_buffer(content, content.lower(), lowered_bytes, wanted)
+                ]
+        else:
+            text = content.lower()
+            if len(text) != len(content) or any(sep in content for sep in _OTHER_LINE_BREAKS):
+                matched = _scan_lines(content, lowered, wanted)
+            else:
+                matched = _scan_buffer(content, text, lowered, wanted)
 
         if matched:
             all_matches.append(f"[{label}]")
-            all_matches.extend(matched[:max_lines // len(index_files)])
+            all_matches.extend(matched[:limit])
 
     if not all_matches:
         return ""
@@ -136,7 +239,7 @@ def search_index_files(index_dir: Path, terms: List[str], max_lines: int = 30) -
 def main() -> None:
     # Read hook input from stdin
     try:
-        input_data = json.load(sys.stdin)
+        input_data = _loads(sys.stdin.buffer.read())
     except (json.JSONDecodeError, Exception):
         sys.exit(0)  # Don't block on parse errors
 
@@ -24,192 +24,224 @@ import json
 import os
 import re
 import sys
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
-
-
-def parse_transcript(transcript_path: str) -> List[Dict[str, Any]]:
-    """Parse JSONL transcript into list of entries."""
-    entries = []
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+try:
+    import orjson  # Optional faster JSON decoder
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
+
+# Words that indicate something is DONE, not outstanding (matched as
+# case-insensitive line prefixes)
+_DONE_PREFIXES = (
+    "done", "completed", "finished", "fixed", "resolved",
+    "implemented", "created", "added", "updated", "already",
+)
+_DONE_PREFIX_LEN = max(len(prefix) for prefix in _DONE_PREFIXES)
+
+# Strong TODO/FIXME markers (always include, case-sensitive) or weaker
+# "outstanding work" patterns that must appear as actionable statements
+_OUTSTANDING_RE = re.compile(
+    r'\b(?:TODO|FIXME|HACK|XXX)\b'
+    r'|(?i:still need to|needs to be|should still|not yet implemented|'
+    r'remains to be|outstanding issue|incomplete|unfinished|'
+    r'couldn\'t|was not able to|failed to|blocked by)'
+)
+
+# Tags marking command output and system messages rather than user requests
+_SKIP_TAGS = (
+    "<command-message>", "<command-name>",
+    "<local-command-stdout>", "<system-reminder>",
+)
+_SKIP_TAGS_RE = re.compile("|".join(map(re.escape, _SKIP_TAGS)))
+
+
+def iter_entries(transcript_path: str) -> Iterator[Dict[str, Any]]:
+    """Stream parsed entries from a JSONL transcript, skipping bad lines."""
     try:
-        with open(transcript_path, "r", encoding="utf-8") as f:
+        # Binary mode: orjson parses bytes directly (json.loads accepts them too)
+        with open(transcript_path, "rb") as f:
             for line in f:
-                line = line.strip()
-                if not line:
+                # Skip blank lines without copying each line like strip() would
+                if line.isspace():
                     continue
                 try:
-                    entries.append(json.loads(line))
-                except json.JSONDecodeError:
+                    yield _loads(line)
+                except ValueError:  # JSONDecodeError or invalid UTF-8
                     continue
     except Exception:
-        pass
-    return entries
+        return
+
+
+def _apply_task_call(name: str, inp: Dict[str, Any], created_tasks: Dict[str, Dict]) -> None:
+    """Apply a TaskCreate/TaskUpdate tool call to the task table."""
+    if name == "TaskCreate":
+        task_id = str(len(created_tasks) + 1)
+        created_tasks[task_id] = {
+            "subject": inp.get("subject", "Unknown task"),
+            "description": inp.get("description", ""),
+            "status": "pending",
+        }
+
+    elif name == "TaskUpdate":
+        tid = inp.get("taskId", "")
+        new_status = inp.get("status", "")
+        if tid in created_tasks and new_status:
+            created_tasks[tid]["status"] = new_status
+        # Also update subject/description if provided
+        if tid in created_tasks:
+            if inp.get("subject"):
+                created_tasks[tid]["subject"] = inp["subject"]
+            if inp.get("description"):
+                created_tasks[tid]["description"] = inp["description"]
+
+
+def _tasks_from_todos(todos: List[Dict[str, Any]]) -> Dict[str, Dict]:
+    """Build the task table from a task system `todos` snapshot."""
+    tasks: Dict[str, Dict] = {}
+    for todo in todos:
+        tid = todo.get("id", str(len(tasks) + 1))
+        tasks[tid] = {
+            "subject": todo.get("subject", "Unknown"),
+            "description": todo.get("description", ""),
+            "status": todo.get("status", "pending"),
+        }
+    return tasks
+
+
+def _user_request_text(entry: Dict[str, Any]) -> Optional[str]:
+    """Return the text of a user entry, or None if it is not a real request."""
+    message = entry.get("message", {})
+    content = message.get("content", "")
+
+    # Skip tool results
+    if isinstance(content, list):
+        texts = []
+        for block in content:
+            if isinstance(block, str):
+                texts.append(block)
+                continue
+            try:
+                if block["type"] == "text":
+                    texts.append(block.get("text", ""))
+            except (TypeError, KeyError):
+                continue
+        content = " ".join(texts)
 
+    if not content or len(content.strip()) < 3:
+        return None
+    # Skip command messages and system tags (they can appear mid-message)
+    if _SKIP_TAGS_RE.search(content):
+        return None
+    # Skip meta/system messages
+    if entry.get("isMeta"):
+        return None
 
-def extract_tasks_from_transcript(entries: List[Dict[str, Any]]) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
-    """Extract tasks from TaskCreate/TaskUpdate tool calls.
+    return content.strip()
 
-    Returns: (created_tasks, completed_task_ids)
-    """
-    created_tasks = {}  # task_id -> {subject, description, status}
-    task_counter = 0
 
-    for entry in entries:
-        if entry.get("type") != "assistant":
+def _collect_mentions(text: str, mentions: Deque[str], seen: Set[str]) -> None:
+    """Collect TODO/FIXME/remaining work mentions from assistant text."""
+    # Let the regex find candidate lines instead of splitting every line
+    pos = 0
+    while True:
+        match = _OUTSTANDING_RE.search(text, pos)
+        if match is None:
+            break
+        start = text.rfind("\n", 0, match.start()) + 1
+        end = text.find("\n", match.end())
+        if end == -1:
+            end = len(text)
+        pos = end + 1  # Only consider each line once
+        line_stripped = text[start:end].strip()
+
+        # Skip very short or very long lines
+        if not 10 < len(line_stripped) < 300:
             continue
 
-        message = entry.get("message", {})
-        content = message.get("content", [])
-        if not isinstance(content, list):
+        # Skip lines that start with completion words
+        if line_stripped[:_DONE_PREFIX_LEN].lower().startswith(_DONE_PREFIXES):
             continue
 
-        for block in content:
-            if not isinstance(block, dict):
-                continue
-            if block.get("type") != "tool_use":
-                continue
+        normalized = line_stripped.lower()
+        if normalized not in seen:
+            seen.add(normalized)
+            mentions.append(line_stripped)
 
-            name = block.get("name", "")
-            inp = block.get("input", {})
-
-            if name == "TaskCreate":
-                task_counter += 1
-                task_id = str(task_counter)
-                created_tasks[task_id] = {
-                    "subject": inp.get("subject", "Unknown task"),
-                    "description": inp.get("description", ""),
-                    "status": "pending",
-                }
-
-            elif name == "TaskUpdate":
-                tid = inp.get("taskId", "")
-                new_status = inp.get("status", "")
-                if tid in created_tasks and new_status:
-                    created_tasks[tid]["status"] = new_status
-                # Also update subject/description if provided
-                if tid in created_tasks:
-                    if inp.get("subject"):
-                        created_tasks[tid]["subject"] = inp["subject"]
-                    if inp.get("description"):
-                        created_tasks[tid]["description"] = inp["description"]
-
-    # Also check the todos field on the last message that has it
-    last_todos = None
-    for entry in reversed(entries):
-        todos = entry.get("todos")
-        if todos and isinstance(todos, list) and len(todos) > 0:
-            last_todos = todos
-            break
 
-    if last_todos:
-        # Override with actual task system state
-        created_tasks.clear()
-        for todo in last_todos:
-            tid = todo.get("id", str(len(created_tasks) + 1))
-            created_tasks[tid] = {
-                "subject": todo.get("subject", "Unknown"),
-                "description": todo.get("description", ""),
-                "status": todo.get("status", "pending"),
-            }
+def extract_all(
+    entries: Iterable[Dict[str, Any]],
+    max_messages: int = 10,
+    max_mentions: int = 20,
+) -> Tuple[Dict[str, Dict], List[str], List[str]]:
+    """Extract tasks, user requests and outstanding mentions in one pass.
 
-    return created_tasks
+    Only the last `max_messages` user requests and the last `max_mentions`
+    mentions (most recent are most relevant) are kept.
 
+    Returns: (tasks, user_requests, mentions)
+    """
+    created_tasks: Dict[str, Dict] = {}  # task_id -> {subject, description, status}
+    last_todos = None
+    user_messages: Deque[str] = deque(maxlen=max_messages)
+    mentions: Deque[str] = deque(maxlen=max_mentions)
+    seen: Set[str] = set()
 
-def extract_user_requests(entries: List[Dict[str, Any]], max_messages: int = 10) -> List[str]:
-    """Extract the last N user messages for context."""
-    user_messages = []
     for entry in entries:
-        if entry.get("type") != "user":
-            continue
-        message = entry.get("message", {})
-        content = message.get("content", "")
+        # Remember the last message carrying the task system state. Once one
+        # has been seen it overrides any TaskCreate/TaskUpdate reconstruction,
+        # so stop replaying those tool calls.
+        todos = entry.get("todos")
+        if todos and isinstance(todos, list):
+            last_todos = todos
+            created_tasks.clear()
 
-        # Skip tool results
-        if isinstance(content, list):
-            texts = []
+        entry_type = entry.get("type")
+        if entry_type == "assistant":
+            content = entry.get("message", {}).get("content", [])
+            if not isinstance(content, list):
+                continue
+            # One walk over the blocks feeds both the tasks and the mentions
             for block in content:
-                if isinstance(block, dict):
-                    if block.get("type") == "text":
-                        texts.append(block.get("text", ""))
-                    elif block.get("type") == "tool_result":
-                        continue
-                elif isinstance(block, str):
-                    texts.append(block)
-            content = " ".join(texts)
-
-        if not content or len(content.strip()) < 3:
-            continue
-        # Skip command messages and system tags
-        if any(tag in content for tag in [
-            "<command-message>", "<command-name>",
-            "<local-command-stdout>", "<system-reminder>",
-        ]):
-            continue
-        # Skip meta/system messages
-        if entry.get("isMeta"):
-            continue
+                # Blocks are almost always dicts; skip anything else
+                try:
+                    block_type = block["type"]
+                except (TypeError, KeyError):
+                    continue
+                if block_type == "text":
+                    _collect_mentions(block.get("text", ""), mentions, seen)
+                elif block_type == "tool_use" and last_todos is None:
+                    _apply_task_call(
+                        block.get("name", ""), block.get("input", {}), created_tasks,
+                    )
+        elif entry_type == "user":
+            request = _user_request_text(entry)
+            if request:
+                user_messages.append(request)
 
-        user_messages.append(content.strip())
+    if last_todos:
+        # Override with actual task system state
+        created_tasks = _tasks_from_todos(last_todos)
 
-    return user_messages[-max_messages:]
+    return created_tasks, list(user_messages), list(mentions)
 
 
-def extract_outstanding_mentions(entries: List[Dict[str, Any]]) -> List[str]:
-    """Extract TODO/FIXME/remaining work mentions from assistant messages."""
-    mentions = []
-    seen = set()
+def _truncate(text: str, limit: int) -> str:
+    """Cut text to `limit` characters, marking the cut with an ellipsis."""
+    return text[:limit] + "..." if len(text) > limit else text
 
-    # Words that indicate something is DONE, not outstanding
-    done_prefixes = re.compile(
-        r'^\s*(done|completed|finished|fixed|resolved|implemented|created|added|updated|already)',
-        re.IGNORECASE,
-    )
 
-    for entry in entries:
-        if entry.get("type") != "assistant":
-            continue
-        message = entry.get("message", {})
-        content = message.get("content", [])
-        if not isinstance(content, list):
-            continue
-
-        for block in content:
-            if not isinstance(block, dict) or block.get("type") != "text":
-                continue
-            text = block.get("text", "")
-            for line in text.split("\n"):
-                line_stripped = line.strip()
-
-                # Skip lines that start with completion words
-                if done_prefixes.match(line_stripped):
-                    continue
-
-                # Look for strong TODO/FIXME markers (always include)
-                strong_match = re.search(
-                    r'\b(TODO|FIXME|HACK|XXX)\b',
-                    line_stripped,
-                )
-                # Look for weaker "outstanding work" patterns
-                # but require they appear as actionable statements
-                weak_match = re.search(
-                    r'(still need to|needs to be|should still|not yet implemented|'
-                    r'remains to be|outstanding issue|incomplete|unfinished|'
-                    r'couldn\'t|was not able to|failed to|blocked by)',
-                    line_stripped,
-                    re.IGNORECASE,
-                )
-
-                if strong_match or weak_match:
-                    # Skip very short or very long lines
-                    if 10 < len(line_stripped) < 300:
-                        normalized = line_stripped.lower()
-                        if normalized not in seen:
-                            seen.add(normalized)
-                            mentions.append(line_stripped)
-
-    # Only return the last 20 mentions (most recent are most relevant)
-    return mentions[-20:]
+def _format_task(task: Dict[str, Any]) -> str:
+    """Format an incomplete task as a TODO.md checkbox line."""
+    status_icon = "🔄" if task["status"] == "in_progress" else "⬜"
+    # Truncate long descriptions
+    desc = f" — {_truncate(task['description'], 200)}" if task.get("description") else ""
+    return f"- [ ] {status_icon} {task['subject']}{desc}"
 
 
 def build_todo_content(
@@ -229,65 +261,70 @@ def build_todo_content(
     if not incomplete_tasks and not mentions:
         return None
 
-    now = datetime.now().strftime("%Y-%m-%d %H:%M")
-    lines = []
-    lines.append(f"\n## Session {now} ({session_id[:8]})")
-    lines.append("")
+    # Each subsection is a heading plus one line per item, and subsections
+    # are separated by a blank line
+    sections = []
 
     if incomplete_tasks:
-        lines.append("### Incomplete Tasks")
-        for tid, task in sorted(incomplete_tasks.items()):
-            status_icon = "🔄" if task["status"] == "in_progress" else "⬜"
-            line = f"- [ ] {status_icon} {task['subject']}"
-            if task.get("description"):
-                # Truncate long descriptions
-                desc = task["description"][:200]
-                if len(task["description"]) > 200:
-                    desc += "..."
-                line += f" — {desc}"
-            lines.append(line)
-        lines.append("")
+        sections.append("### Incomplete Tasks\n" + "".join(
+            f"{_format_task(task)}\n" for _, task in sorted(incomplete_tasks.items())
+        ))
 
     if mentions:
-        lines.append("### Outstanding Items")
-        for mention in mentions:
-            # Clean up the mention
-            clean = mention.lstrip("- *>#")
-            lines.append(f"- [ ] {clean.strip()}")
-        lines.append("")
+        # Clean up the mentions
+        sections.append("### Outstanding Items\n" + "".join(
+            f"- [ ] {mention.lstrip('- *>#').strip()}\n" for mention in mentions
+        ))
 
     if user_requests:
-        lines.append("### Last User Requests (context)")
-        for req in user_requests[-5:]:
-            # Truncate long requests
-            short = req[:150]
-            if len(req) > 150:
-                short += "..."
-            lines.append(f"- {short}")
-        lines.append("")
+        # Truncate long requests
+        sections.append("### Last User Requests (context)\n" + "".join(
+            f"- {_truncate(req, 150)}\n" for req in user_requests[-5:]
+        ))
 
-    return "\n".join(lines)
+    now = datetime.now().strftime("%Y-%m-%d %H:%M")
+    return f"\n## Session {now} ({session_id[:8]})\n\n" + "\n".join(sections)
 
 
 def write_todo(project_dir: str, content: str) -> None:
-    """Create or append to TODO.md in the project directory."""
+    """Create or append to TODO.md in the project directory.
+
+    Appends in place instead of rewriting the file, which grows with every
+    session; only its trailing line breaks are read and trimmed.
+    """
     todo_path = Path(project_dir) / "TODO.md"
 
-    if todo_path.exists():
-        existing = todo_path.read_text(encoding="utf-8")
-        # Append new section
-        updated = existing.rstrip("\n") + "\n" + content
-    else:
+    try:
+        f = open(todo_path, "r+b")
+    except FileNotFoundError:
         # Create new file with header
-        updated = "# TODO\n\nOutstanding issues from Claude Code sessions.\n" + content
-
-    todo_path.write_text(updated, encoding="utf-8")
+        todo_path.write_text(
+            "# TODO\n\nOutstanding issues from Claude Code sessions.\n" + content,
+            encoding="utf-8",
+        )
+        return
+
+    with f:
+        # Strip trailing line breaks, reading backwards from the end in chunks
+        end = f.seek(0, os.SEEK_END)
+        while end > 0:
+            start = max(end - 64, 0)
+            f.seek(start)
+            kept = f.read(end - start).rstrip(b"\r\n")
+            end = start + len(kept)
+            if kept:
+                break
+        f.truncate(end)
+
+        # Append new section, with the newlines text mode would write
+        f.seek(end)
+        f.write(("\n" + content).replace("\n", os.linesep).encode("utf-8"))
 
 
 def main() -> None:
     # Read hook input from stdin
     try:
-        input_data = json.load(sys.stdin)
+        input_data = _loads(sys.stdin.buffer.read())
     except (json.JSONDecodeError, Exception):
         sys.exit(0)
 
@@ -303,15 +340,8 @@ def main() -> None:
     if not transcript_path or not Path(transcript_path).exists():
         sys.exit(0)
 
-    # Parse transcript
-    entries = parse_transcript(transcript_path)
-    if not entries:
-        sys.exit(0)
-
-    # Extract data
-    tasks = extract_tasks_from_transcript(entries)
-    user_requests = extract_user_requests(entries)
-    mentions = extract_outstanding_mentions(entries)
+    # Stream the transcript and extract data in a single pass
+    tasks, user_requests, mentions = extract_all(iter_entries(transcript_path))
 
     # Build TODO content
     content = build_todo_content(tasks, user_requests, mentions, session_id, project_dir)